@@ -25,3 +25,25 @@ class BuildingResponseDTO(BaseModel):
     created_at: datetime
     updated_at: datetime
     model_config = ConfigDict(from_attributes=True)
+
+# --- Toplu Bina İşlemleri ---
+class BuildingBulkFilterDTO(BaseModel):
+    campus_id: Optional[int] = Field(None, description="Kampüs ID'sine göre filtrele")
+    type: Optional[str] = Field(None, max_length=50, description="Bina tipine göre filtrele")
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=1000, description="Bina ID listesi (en fazla 1000)")
+
+class BuildingBulkValuesDTO(BuildingUpdateDTO):
+    # BuildingUpdateDTO kuralları geçerlidir; campus_id yalnızca açıkça reddedilebilmesi için tanımlıdır
+    campus_id: Optional[int] = None
+
+class BuildingBulkItemDTO(BuildingBulkValuesDTO):
+    id: int
+
+class BuildingBulkUpdateDTO(BaseModel):
+    filter: Optional[BuildingBulkFilterDTO] = Field(None, description="values ile birlikte: eşleşen tüm binalara aynı değerler")
+    values: Optional[BuildingBulkValuesDTO] = None
+    items: Optional[List[BuildingBulkItemDTO]] = Field(None, min_length=1, max_length=1000, description="Bina başına farklı değerler (tek sorguda, en fazla 1000)")
+
+class BuildingBulkResultDTO(BaseModel):
+    count: int = Field(..., description="Etkilenen bina sayısı")
+    ids: Optional[List[int]] = Field(None, description="return_ids=true ise etkilenen bina ID'leri (en fazla 1000)")
@@ -1,4 +1,9 @@
+from psycopg2.extras import execute_values
+
 class BuildingRepository:
+    # Silinmekte olan kampüslerin binaları hiçbir okuma/yazma yolunda görünmez
+    ACTIVE_CAMPUS_CONDITION = "EXISTS (SELECT 1 FROM campuses c WHERE c.id = {table}.campus_id AND c.deleting = FALSE)"
+
     def __init__(self, conn):
         self.conn = conn
     
@@ -26,7 +31,7 @@ class BuildingRepository:
             if campus_id is not None:
                 cur.execute('SELECT * FROM buildings WHERE campus_id = %s ORDER BY id', (campus_id,))
             else:
-                cur.execute('SELECT * FROM buildings ORDER BY id')
+                cur.execute(f"SELECT * FROM buildings WHERE {self.ACTIVE_CAMPUS_CONDITION.format(table='buildings')} ORDER BY id")
             
             buildings = cur.fetchall()
             return [dict(building) for building in buildings]
@@ -38,7 +43,10 @@ class BuildingRepository:
     def find_by_id(self, building_id: int) -> Optional[dict]:
         cur = self.conn.cursor()
         try:
-            cur.execute('SELECT * FROM buildings WHERE id = %s', (building_id,))
+            cur.execute(
+                f"SELECT * FROM buildings WHERE id = %s AND {self.ACTIVE_CAMPUS_CONDITION.format(table='buildings')}",
+                (building_id,)
+            )
             building = cur.fetchone()
             return dict(building) if building else None
         except Exception as e:
@@ -53,7 +61,7 @@ class BuildingRepository:
             query = f"""
             UPDATE buildings 
             SET {set_clause}, updated_at = CURRENT_TIMESTAMP
-            WHERE id = %(id)s
+            WHERE id = %(id)s AND {self.ACTIVE_CAMPUS_CONDITION.format(table='buildings')}
             RETURNING *;
             """
             building_data['id'] = building_id
@@ -70,7 +78,10 @@ class BuildingRepository:
     def delete(self, building_id: int) -> Optional[dict]:
         cur = self.conn.cursor()
         try:
-            cur.execute('DELETE FROM buildings WHERE id = %s RETURNING *', (building_id,))
+            cur.execute(
+                f"DELETE FROM buildings WHERE id = %s AND {self.ACTIVE_CAMPUS_CONDITION.format(table='buildings')} RETURNING *",
+                (building_id,)
+            )
             building = cur.fetchone()
             self.conn.commit()
             return dict(building) if building else None
@@ -79,3 +90,99 @@ class BuildingRepository:
             raise Exception(f"Veritabanı bina silme hatası: {str(e)}")
         finally:
             cur.close()
+
+    # Toplu güncellemede VALUES satırlarının tipleri PostgreSQL'e açıkça bildirilir
+    BULK_COLUMN_TYPES = {
+        'id': 'integer',
+        'name': 'varchar',
+        'type': 'varchar',
+        'floor_count': 'integer',
+        'construction_year': 'integer',
+        'gross_area': 'numeric',
+    }
+    # return_ids istendiğinde döndürülecek en fazla ID sayısı
+    BULK_RETURN_IDS_LIMIT = 1000
+
+    def _bulk_result_query(self, statement: str, return_ids: bool) -> str:
+        # Etkilenen satırlar veritabanında sayılır; ID'ler yalnızca istenirse ve sınırlı sayıda döner
+        ids_column = f", (array_agg(id ORDER BY id))[1:{self.BULK_RETURN_IDS_LIMIT}] AS ids" if return_ids else ""
+        return f"WITH affected AS ({statement}) SELECT count(*) AS count{ids_column} FROM affected;"
+
+    def _bulk_result(self, row, return_ids: bool) -> dict:
+        return {'count': row['count'], 'ids': (row['ids'] or []) if return_ids else None}
+
+    def _bulk_where_clause(self, filter_data: dict) -> str:
+        conditions = [self.ACTIVE_CAMPUS_CONDITION.format(table='buildings')]
+        if 'campus_id' in filter_data:
+            conditions.append('campus_id = %(campus_id)s')
+        if 'type' in filter_data:
+            conditions.append('type = %(type)s')
+        if 'ids' in filter_data:
+            conditions.append('id = ANY(%(ids)s)')
+        return ' AND '.join(conditions)
+
+    def bulk_update_by_filter(self, filter_data: dict, building_data: dict, return_ids: bool = False) -> dict:
+        """Filtreye uyan tüm binalara aynı değerleri tek UPDATE ile uygular, etkilenen sayıyı (ve istenirse ID'leri) döndürür."""
+        cur = self.conn.cursor()
+        try:
+            # SET parametreleri filtre parametreleriyle (ör. type) çakışmasın
+            set_clause = ", ".join([f"{key} = %(set_{key})s" for key in building_data.keys()])
+            statement = f"""
+            UPDATE buildings
+            SET {set_clause}, updated_at = CURRENT_TIMESTAMP
+            WHERE {self._bulk_where_clause(filter_data)}
+            RETURNING id
+            """
+            params = dict(filter_data)
+            params.update({f"set_{key}": value for key, value in building_data.items()})
+            cur.execute(self._bulk_result_query(statement, return_ids), params)
+            result = self._bulk_result(cur.fetchone(), return_ids)
+            self.conn.commit()
+            return result
+        except Exception as e:
+            self.conn.rollback()
+            raise Exception(f"Veritabanı toplu bina güncelleme hatası: {str(e)}")
+        finally:
+            cur.close()
+
+    def bulk_update_by_ids(self, rows: List[dict], fields: List[str], return_ids: bool = False) -> dict:
+        """Bina başına farklı değerleri UPDATE ... FROM (VALUES ...) ile tek sorguda uygular."""
+        cur = self.conn.cursor()
+        try:
+            columns = ['id'] + fields
+            set_clause = ", ".join([f"{key} = v.{key}" for key in fields])
+            statement = f"""
+            UPDATE buildings AS b
+            SET {set_clause}, updated_at = CURRENT_TIMESTAMP
+            FROM (VALUES %s) AS v ({", ".join(columns)})
+            WHERE b.id = v.id AND {self.ACTIVE_CAMPUS_CONDITION.format(table='b')}
+            RETURNING b.id
+            """
+            template = "(" + ", ".join([f"%({key})s::{self.BULK_COLUMN_TYPES[key]}" for key in columns]) + ")"
+            # page_size=len(rows): execute_values tüm satırları tek ifadede göndersin
+            rows_out = execute_values(
+                cur, self._bulk_result_query(statement, return_ids), rows,
+                template=template, page_size=len(rows), fetch=True
+            )
+            result = self._bulk_result(rows_out[0], return_ids)
+            self.conn.commit()
+            return result
+        except Exception as e:
+            self.conn.rollback()
+            raise Exception(f"Veritabanı toplu bina güncelleme hatası: {str(e)}")
+        finally:
+            cur.close()
+
+    def bulk_delete(self, filter_data: dict, return_ids: bool = False) -> dict:
+        cur = self.conn.cursor()
+        try:
+            statement = f"DELETE FROM buildings WHERE {self._bulk_where_clause(filter_data)} RETURNING id"
+            cur.execute(self._bulk_result_query(statement, return_ids), filter_data)
+            result = self._bulk_result(cur.fetchone(), return_ids)
+            self.conn.commit()
+            return result
+        except Exception as e:
+            self.conn.rollback()
+            raise Exception(f"Veritabanı toplu bina silme hatası: {str(e)}")
+        finally:
+            cur.close()
@@ -27,3 +27,15 @@ class CampusResponseDTO(BaseModel):
     updated_at: datetime
     model_config = ConfigDict(from_attributes=True)
 
+class CampusDeleteJobResponseDTO(BaseModel):
+    id: int
+    campus_id: int
+    status: str = Field(..., description="pending, running, completed veya failed")
+    deleted_buildings: int = Field(..., description="Şimdiye kadar silinen bina sayısı")
+    attempts: int = Field(..., description="Başarısız deneme sayısı")
+    error: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+    completed_at: Optional[datetime]
+    model_config = ConfigDict(from_attributes=True)
+
@@ -13,5 +13,6 @@ class Campus(SQLModel, table=True):
     established_year: Optional[int] = None
     total_area: Optional[float] = None
     student_capacity: Optional[int] = None
+    deleting: bool = False  # Arka planda silinmekte olan kampüsler okumalardan gizlenir
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
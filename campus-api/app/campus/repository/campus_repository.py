@@ -20,7 +20,8 @@ class CampusRepository:
     
     def find_all(self, city: Optional[str] = None) -> List[Campus]:
         try:
-            statement = select(Campus).order_by(Campus.id)
+            # Arka planda silinmekte olan kampüsler listelenmez
+            statement = select(Campus).where(Campus.deleting == False).order_by(Campus.id)
             if city:
                 statement = statement.where(Campus.city.ilike(f"%{city}%"))
             campuses = self.session.exec(statement).all()
@@ -30,13 +31,13 @@ class CampusRepository:
     
     def find_by_id(self, campus_id: int) -> Optional[Campus]:
         try:
-            return self.session.get(Campus, campus_id)
+            return self._get_active(campus_id)
         except Exception as e:
             raise Exception(f"Veritabanı getirme hatası: {str(e)}")
     
     def update(self, campus_id: int, campus_data: dict) -> Optional[Campus]:
         try:
-            campus = self.session.get(Campus, campus_id)
+            campus = self._get_active(campus_id)
             if not campus:
                 return None
             for key, value in campus_data.items():
@@ -51,7 +52,7 @@ class CampusRepository:
     
     def delete(self, campus_id: int) -> Optional[Campus]:
         try:
-            campus = self.session.get(Campus, campus_id)
+            campus = self._get_active(campus_id)
             if not campus:
                 return None
             self.session.delete(campus)
@@ -61,3 +62,8 @@ class CampusRepository:
             self.session.rollback()
             raise Exception(f"Veritabanı silme hatası: {str(e)}")
 
+    def _get_active(self, campus_id: int) -> Optional[Campus]:
+        # Silinmekte olan kampüs, silme işi bitene kadar yokmuş gibi davranır
+        campus = self.session.get(Campus, campus_id)
+        return campus if campus and not campus.deleting else None
+
@@ -1,3 +1,5 @@
+from psycopg2.extensions import connection as PgConnection
+
 # ==================== CONFIGURATION ====================
 DB_CONFIG = {
     'host': os.getenv('DATABASE_HOST', 'localhost'),
@@ -7,13 +9,24 @@ DB_CONFIG = {
     'password': os.getenv('DATABASE_PASSWORD', '12345'),
 }
 
+# Rota sınıfına göre statement_timeout (ms). 0 = sınırsız (PostgreSQL varsayılanı)
+STATEMENT_TIMEOUTS = {
+    'read': int(os.getenv('STATEMENT_TIMEOUT_READ_MS', 5000)),
+    'write': int(os.getenv('STATEMENT_TIMEOUT_WRITE_MS', 15000)),
+    'background': int(os.getenv('STATEMENT_TIMEOUT_BACKGROUND_MS', 60000)),
+}
+
 # ==================== DATABASE İŞLEMLERİ ====================
+class PooledConnection(PgConnection):
+    """Son uygulanan statement_timeout değerini bağlantının kendisinde tutar (bağlantı kapanınca birlikte gider)."""
+    applied_statement_timeout: Optional[int] = None
+
 def initialize_db_pool():
     """Veritabanı bağlantı havuzunu başlatır."""
     global pool
     try:
         # minconn=1, maxconn=10: 1'den 10'a kadar bağlantı yönetimi yapar.
-        pool = SimpleConnectionPool(minconn=1, maxconn=10, **DB_CONFIG)
+        pool = SimpleConnectionPool(minconn=1, maxconn=10, connection_factory=PooledConnection, **DB_CONFIG)
         print('✅ Veritabanı Bağlantı Havuzu Başarıyla Başlatıldı.')
     except Exception as e:
         print(f'❌ Bağlantı Havuzu Başlatma Hatası: {e}')
@@ -26,18 +39,49 @@ def close_db_pool():
         pool.closeall()
         print('✅ Veritabanı Bağlantı Havuzu Kapatıldı.')
 
-def get_db_connection():
-    """Bağımlılık Enjeksiyonu için: Havuzdan bir bağlantı alır ve iş bitince havuza iade eder."""
+def _pooled_connection(route_class: str):
+    """Havuzdan bir bağlantı alır, rota sınıfının zaman aşımı ve işlem kipini uygular, iş bitince havuza iade eder."""
     if not pool:
         raise Exception("Veritabanı bağlantı havuzu başlatılmamış.")
-        
+
     conn = pool.getconn()
     try:
+        # İşlem kipi istemci tarafında tutulur (sunucuya gidiş-dönüş yok)
+        conn.set_session(readonly=(route_class == 'read'))
+        # statement_timeout yalnızca bağlantının mevcut değerinden farklıysa ayarlanır
+        timeout = STATEMENT_TIMEOUTS[route_class]
+        if conn.applied_statement_timeout != timeout:
+            cur = conn.cursor()
+            try:
+                cur.execute('SET statement_timeout = %s', (timeout,))
+            finally:
+                cur.close()
+            conn.commit()
+            conn.applied_statement_timeout = timeout
         # Bağlantıyı isteği işleyen fonksiyona yolla (yield)
         yield conn
     finally:
-        # İstek tamamlanınca bağlantıyı havuza geri bırak
-        pool.putconn(conn)
+        # Açık kalan işlemi (ör. salt-okunur okuma) hemen kapat ve bağlantıyı havuza geri bırak
+        try:
+            if not conn.closed:
+                conn.rollback()
+        except Exception:
+            # Bozuk bağlantı havuza dönmez; kapatılıp havuzdan çıkarılır (bağlantı sızmaz)
+            pool.putconn(conn, close=True)
+        else:
+            pool.putconn(conn)
+
+def get_db_connection():
+    """Bağımlılık Enjeksiyonu için: Yazma rotalarına havuzdan bir bağlantı verir."""
+    yield from _pooled_connection('write')
+
+def get_read_db_connection():
+    """Bağımlılık Enjeksiyonu için: Okuma rotalarına kısa zaman aşımlı, salt-okunur bir bağlantı verir."""
+    yield from _pooled_connection('read')
+
+def get_background_db_connection():
+    """Arka plan işleri için: Uzun zaman aşımlı bir bağlantı verir."""
+    yield from _pooled_connection('background')
 
 def create_tables():
     """Veritabanı tablolarını oluştur/güncelle."""
@@ -74,7 +118,40 @@ def create_tables():
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
         """)
-        
+
+        # 3. Silinmekte olan kampüsler okumalardan gizlenir (arka plan silme işi bitene kadar)
+        cur.execute("""
+        ALTER TABLE campuses ADD COLUMN IF NOT EXISTS deleting BOOLEAN NOT NULL DEFAULT FALSE;
+        """)
+
+        # 4. Kampüs Silme İşleri Tablosu (binalar parça parça silinir, yeniden başlatmada kaldığı yerden devam eder)
+        # campus_id bilinçli olarak dış anahtar değildir: iş kaydı kampüs silindikten sonra da durum sorgusu için kalır.
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS campus_delete_jobs (
+            id SERIAL PRIMARY KEY,
+            campus_id INTEGER NOT NULL,
+            status VARCHAR(20) NOT NULL DEFAULT 'pending', -- pending, running, completed, failed
+            deleted_buildings INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0, -- başarısız deneme sayısı
+            available_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, -- yeniden deneme bu zamandan önce alınmaz
+            lease_token VARCHAR(36), -- işi yürüten işçinin kimliği
+            heartbeat_at TIMESTAMP, -- süresi dolan 'running' işler başka bir işçi tarafından devralınır
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            completed_at TIMESTAMP
+        );
+        """)
+
+        # Bir kampüs için aynı anda yalnızca bir aktif silme işi olabilir
+        cur.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_campus_delete_jobs_active
+        ON campus_delete_jobs (campus_id) WHERE status IN ('pending', 'running');
+        """)
+
+        # Parça parça silme sorgusu campus_id üzerinden bina seçer
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_buildings_campus_id ON buildings (campus_id);")
+
         conn.commit()
         print('✅ Kampüs ve Bina tabloları başarıyla oluşturuldu/güncellendi.')
     except Exception as e:
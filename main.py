@@ -1,16 +1,56 @@
 # main.py - Tek Dosyada Kampüs ve Bina Yönetimi API
-from fastapi import FastAPI, HTTPException, status, Depends, Query
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List
+from fastapi import FastAPI, HTTPException, status, Depends, Query, Request, Response, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field, ConfigDict, ValidationError
+from typing import Optional, List, Union, Deque
 from datetime import datetime
+from collections import defaultdict, deque
+from contextvars import ContextVar, copy_context
 from sqlmodel import Session, select
+from psycopg2.extras import execute_values
 import os
+import uuid
+import io
+import time
+import hmac
+import random
+import marshal
+import asyncio
+import cProfile
+import pstats
+import functools
+import itertools
+import threading
 
 
 
 # Global Bağlantı Havuzu
 pool: Optional[SimpleConnectionPool] = None
 
+# Arka plan kampüs silme ayarları
+CAMPUS_DELETE_BATCH_SIZE = int(os.getenv('CAMPUS_DELETE_BATCH_SIZE', 1000))
+CAMPUS_DELETE_POLL_INTERVAL = float(os.getenv('CAMPUS_DELETE_POLL_INTERVAL', 5))
+# Heartbeat'i bu süreden eski 'running' işler başka bir işçi tarafından devralınır.
+# Bir parçanın silinmesi bu süreyi aşmamalı (STATEMENT_TIMEOUT_BACKGROUND_MS'den büyük tutun).
+CAMPUS_DELETE_LEASE_SECONDS = float(os.getenv('CAMPUS_DELETE_LEASE_SECONDS', 120))
+# Hata alan iş en fazla bu kadar denenir; denemeler arası bekleme her denemede RETRY_DELAY kadar artar
+CAMPUS_DELETE_MAX_ATTEMPTS = int(os.getenv('CAMPUS_DELETE_MAX_ATTEMPTS', 5))
+CAMPUS_DELETE_RETRY_DELAY = float(os.getenv('CAMPUS_DELETE_RETRY_DELAY', 10))
+
+# Uzun okumalarda istemci bağlantısının ne sıklıkla kontrol edileceği (saniye)
+DISCONNECT_POLL_INTERVAL = float(os.getenv('DISCONNECT_POLL_INTERVAL', 0.5))
+
+# Profilleme ayarları (varsayılan olarak kapalı)
+PROFILE_ADMIN_TOKEN = os.getenv('PROFILE_ADMIN_TOKEN', '')
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+PROFILE_BUFFER_SIZE = int(os.getenv('PROFILE_BUFFER_SIZE', 20))
+# Profiller yalnızca admin token ile okunabildiğinden token yoksa örnekleme de yapılmaz
+PROFILING_ENABLED = bool(PROFILE_ADMIN_TOKEN)
+if PROFILE_SAMPLE_RATE > 0 and not PROFILE_ADMIN_TOKEN:
+    print('⚠️ PROFILE_SAMPLE_RATE ayarlı fakat PROFILE_ADMIN_TOKEN yok; profiller okunamayacağı için profilleme kapalı.')
+
 
 
 # ==================== PYDANTIC MODELS (DTO) ====================
@@ -20,6 +60,9 @@ pool: Optional[SimpleConnectionPool] = None
 
 
 class BuildingRepository:
+    # Silinmekte olan kampüslerin binaları hiçbir okuma/yazma yolunda görünmez
+    ACTIVE_CAMPUS_CONDITION = "EXISTS (SELECT 1 FROM campuses c WHERE c.id = {table}.campus_id AND c.deleting = FALSE)"
+
     def __init__(self, conn):
         self.conn = conn
     
@@ -47,7 +90,7 @@ class BuildingRepository:
             if campus_id is not None:
                 cur.execute('SELECT * FROM buildings WHERE campus_id = %s ORDER BY id', (campus_id,))
             else:
-                cur.execute('SELECT * FROM buildings ORDER BY id')
+                cur.execute(f"SELECT * FROM buildings WHERE {self.ACTIVE_CAMPUS_CONDITION.format(table='buildings')} ORDER BY id")
             
             buildings = cur.fetchall()
             return [dict(building) for building in buildings]
@@ -59,7 +102,10 @@ class BuildingRepository:
     def find_by_id(self, building_id: int) -> Optional[dict]:
         cur = self.conn.cursor()
         try:
-            cur.execute('SELECT * FROM buildings WHERE id = %s', (building_id,))
+            cur.execute(
+                f"SELECT * FROM buildings WHERE id = %s AND {self.ACTIVE_CAMPUS_CONDITION.format(table='buildings')}",
+                (building_id,)
+            )
             building = cur.fetchone()
             return dict(building) if building else None
         except Exception as e:
@@ -74,7 +120,7 @@ class BuildingRepository:
             query = f"""
             UPDATE buildings 
             SET {set_clause}, updated_at = CURRENT_TIMESTAMP
-            WHERE id = %(id)s
+            WHERE id = %(id)s AND {self.ACTIVE_CAMPUS_CONDITION.format(table='buildings')}
             RETURNING *;
             """
             building_data['id'] = building_id
@@ -91,7 +137,10 @@ class BuildingRepository:
     def delete(self, building_id: int) -> Optional[dict]:
         cur = self.conn.cursor()
         try:
-            cur.execute('DELETE FROM buildings WHERE id = %s RETURNING *', (building_id,))
+            cur.execute(
+                f"DELETE FROM buildings WHERE id = %s AND {self.ACTIVE_CAMPUS_CONDITION.format(table='buildings')} RETURNING *",
+                (building_id,)
+            )
             building = cur.fetchone()
             self.conn.commit()
             return dict(building) if building else None
@@ -101,13 +150,512 @@ class BuildingRepository:
         finally:
             cur.close()
 
+    # Toplu güncellemede VALUES satırlarının tipleri PostgreSQL'e açıkça bildirilir
+    BULK_COLUMN_TYPES = {
+        'id': 'integer',
+        'name': 'varchar',
+        'type': 'varchar',
+        'floor_count': 'integer',
+        'construction_year': 'integer',
+        'gross_area': 'numeric',
+    }
+    # return_ids istendiğinde döndürülecek en fazla ID sayısı
+    BULK_RETURN_IDS_LIMIT = 1000
+
+    def _bulk_result_query(self, statement: str, return_ids: bool) -> str:
+        # Etkilenen satırlar veritabanında sayılır; ID'ler yalnızca istenirse ve sınırlı sayıda döner
+        ids_column = f", (array_agg(id ORDER BY id))[1:{self.BULK_RETURN_IDS_LIMIT}] AS ids" if return_ids else ""
+        return f"WITH affected AS ({statement}) SELECT count(*) AS count{ids_column} FROM affected;"
+
+    def _bulk_result(self, row, return_ids: bool) -> dict:
+        return {'count': row['count'], 'ids': (row['ids'] or []) if return_ids else None}
+
+    def _bulk_where_clause(self, filter_data: dict) -> str:
+        conditions = [self.ACTIVE_CAMPUS_CONDITION.format(table='buildings')]
+        if 'campus_id' in filter_data:
+            conditions.append('campus_id = %(campus_id)s')
+        if 'type' in filter_data:
+            conditions.append('type = %(type)s')
+        if 'ids' in filter_data:
+            conditions.append('id = ANY(%(ids)s)')
+        return ' AND '.join(conditions)
+
+    def bulk_update_by_filter(self, filter_data: dict, building_data: dict, return_ids: bool = False) -> dict:
+        """Filtreye uyan tüm binalara aynı değerleri tek UPDATE ile uygular, etkilenen sayıyı (ve istenirse ID'leri) döndürür."""
+        cur = self.conn.cursor()
+        try:
+            # SET parametreleri filtre parametreleriyle (ör. type) çakışmasın
+            set_clause = ", ".join([f"{key} = %(set_{key})s" for key in building_data.keys()])
+            statement = f"""
+            UPDATE buildings
+            SET {set_clause}, updated_at = CURRENT_TIMESTAMP
+            WHERE {self._bulk_where_clause(filter_data)}
+            RETURNING id
+            """
+            params = dict(filter_data)
+            params.update({f"set_{key}": value for key, value in building_data.items()})
+            cur.execute(self._bulk_result_query(statement, return_ids), params)
+            result = self._bulk_result(cur.fetchone(), return_ids)
+            self.conn.commit()
+            return result
+        except Exception as e:
+            self.conn.rollback()
+            raise Exception(f"Veritabanı toplu bina güncelleme hatası: {str(e)}")
+        finally:
+            cur.close()
+
+    def bulk_update_by_ids(self, rows: List[dict], fields: List[str], return_ids: bool = False) -> dict:
+        """Bina başına farklı değerleri UPDATE ... FROM (VALUES ...) ile tek sorguda uygular."""
+        cur = self.conn.cursor()
+        try:
+            columns = ['id'] + fields
+            set_clause = ", ".join([f"{key} = v.{key}" for key in fields])
+            statement = f"""
+            UPDATE buildings AS b
+            SET {set_clause}, updated_at = CURRENT_TIMESTAMP
+            FROM (VALUES %s) AS v ({", ".join(columns)})
+            WHERE b.id = v.id AND {self.ACTIVE_CAMPUS_CONDITION.format(table='b')}
+            RETURNING b.id
+            """
+            template = "(" + ", ".join([f"%({key})s::{self.BULK_COLUMN_TYPES[key]}" for key in columns]) + ")"
+            # page_size=len(rows): execute_values tüm satırları tek ifadede göndersin
+            rows_out = execute_values(
+                cur, self._bulk_result_query(statement, return_ids), rows,
+                template=template, page_size=len(rows), fetch=True
+            )
+            result = self._bulk_result(rows_out[0], return_ids)
+            self.conn.commit()
+            return result
+        except Exception as e:
+            self.conn.rollback()
+            raise Exception(f"Veritabanı toplu bina güncelleme hatası: {str(e)}")
+        finally:
+            cur.close()
+
+    def bulk_delete(self, filter_data: dict, return_ids: bool = False) -> dict:
+        cur = self.conn.cursor()
+        try:
+            statement = f"DELETE FROM buildings WHERE {self._bulk_where_clause(filter_data)} RETURNING id"
+            cur.execute(self._bulk_result_query(statement, return_ids), filter_data)
+            result = self._bulk_result(cur.fetchone(), return_ids)
+            self.conn.commit()
+            return result
+        except Exception as e:
+            self.conn.rollback()
+            raise Exception(f"Veritabanı toplu bina silme hatası: {str(e)}")
+        finally:
+            cur.close()
+
+
+class CampusDeleteJobRepository:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def enqueue(self, campus_id: int) -> Optional[dict]:
+        """Kampüsü 'silinmekte' olarak işaretler ve silme işini aynı işlemde kuyruğa ekler.
+
+        Kampüs için zaten aktif bir iş varsa yeni iş açılmaz, mevcut iş döndürülür
+        (uq_campus_delete_jobs_active indeksi bunu veritabanında garanti eder).
+        """
+        cur = self.conn.cursor()
+        try:
+            cur.execute(
+                'UPDATE campuses SET deleting = TRUE, updated_at = CURRENT_TIMESTAMP WHERE id = %s RETURNING id',
+                (campus_id,)
+            )
+            if cur.fetchone() is None:
+                self.conn.rollback()
+                return None
+            cur.execute("""
+            INSERT INTO campus_delete_jobs (campus_id) VALUES (%s)
+            ON CONFLICT (campus_id) WHERE status IN ('pending', 'running') DO NOTHING
+            RETURNING *;
+            """, (campus_id,))
+            job = cur.fetchone()
+            if job is None:
+                job = self.find_active_by_campus_id(campus_id)
+            self.conn.commit()
+            return dict(job) if job else None
+        except Exception as e:
+            self.conn.rollback()
+            raise Exception(f"Veritabanı kampüs silme işi oluşturma hatası: {str(e)}")
+        finally:
+            cur.close()
+
+    def find_by_id(self, job_id: int) -> Optional[dict]:
+        cur = self.conn.cursor()
+        try:
+            cur.execute('SELECT * FROM campus_delete_jobs WHERE id = %s', (job_id,))
+            job = cur.fetchone()
+            return dict(job) if job else None
+        except Exception as e:
+            raise Exception(f"Veritabanı kampüs silme işi getirme hatası: {str(e)}")
+        finally:
+            cur.close()
+
+    def find_active_by_campus_id(self, campus_id: int) -> Optional[dict]:
+        cur = self.conn.cursor()
+        try:
+            cur.execute(
+                "SELECT * FROM campus_delete_jobs WHERE campus_id = %s AND status IN ('pending', 'running') ORDER BY id LIMIT 1",
+                (campus_id,)
+            )
+            job = cur.fetchone()
+            return dict(job) if job else None
+        except Exception as e:
+            raise Exception(f"Veritabanı kampüs silme işi getirme hatası: {str(e)}")
+        finally:
+            cur.close()
+
+    def claim_next(self, lease_token: str, lease_seconds: float) -> Optional[dict]:
+        """Sıradaki işi lease_token ile sahiplenir.
+
+        Heartbeat'i lease_seconds'tan eski 'running' işler de alınır; böylece çöken ya da
+        yeniden başlatılan bir işçinin yarım bıraktığı iş kaldığı yerden devam eder, canlı bir
+        işçinin yürüttüğü iş ise başka bir süreç tarafından alınmaz.
+        """
+        cur = self.conn.cursor()
+        try:
+            cur.execute("""
+            UPDATE campus_delete_jobs
+            SET status = 'running', lease_token = %(lease_token)s,
+                heartbeat_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+            WHERE id = (
+                SELECT id FROM campus_delete_jobs
+                WHERE (status = 'pending' AND available_at <= CURRENT_TIMESTAMP)
+                   OR (status = 'running' AND heartbeat_at < CURRENT_TIMESTAMP - make_interval(secs => %(lease_seconds)s))
+                ORDER BY id
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING *;
+            """, {'lease_token': lease_token, 'lease_seconds': lease_seconds})
+            job = cur.fetchone()
+            self.conn.commit()
+            return dict(job) if job else None
+        except Exception as e:
+            self.conn.rollback()
+            raise Exception(f"Veritabanı kampüs silme işi alma hatası: {str(e)}")
+        finally:
+            cur.close()
+
+    def _renew_lease(self, cur, job_id: int, lease_token: str) -> bool:
+        # İş satırını kilitler: aynı işi devralan ikinci bir işçi bu işlem bitene kadar bekler
+        cur.execute("""
+        UPDATE campus_delete_jobs
+        SET heartbeat_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+        WHERE id = %s AND lease_token = %s AND status = 'running';
+        """, (job_id, lease_token))
+        return cur.rowcount == 1
+
+    def delete_batch(self, job_id: int, campus_id: int, lease_token: str, batch_size: int) -> Optional[int]:
+        """Kampüse ait en fazla batch_size binayı kendi kısa işleminde siler, silinen sayıyı döndürür.
+
+        İş artık bu işçiye ait değilse (lease başka bir işçiye geçtiyse) hiçbir şey silmez ve None döndürür.
+        """
+        cur = self.conn.cursor()
+        try:
+            if not self._renew_lease(cur, job_id, lease_token):
+                self.conn.rollback()
+                return None
+            cur.execute("""
+            DELETE FROM buildings
+            WHERE id IN (SELECT id FROM buildings WHERE campus_id = %s LIMIT %s);
+            """, (campus_id, batch_size))
+            deleted = cur.rowcount
+            cur.execute("""
+            UPDATE campus_delete_jobs
+            SET deleted_buildings = deleted_buildings + %s
+            WHERE id = %s;
+            """, (deleted, job_id))
+            self.conn.commit()
+            return deleted
+        except Exception as e:
+            self.conn.rollback()
+            raise Exception(f"Veritabanı bina toplu silme hatası: {str(e)}")
+        finally:
+            cur.close()
+
+    def complete(self, job_id: int, campus_id: int, lease_token: str) -> bool:
+        """Binası kalmayan kampüsü siler ve işi tamamlandı olarak işaretler. İş bu işçiye ait değilse False döner."""
+        cur = self.conn.cursor()
+        try:
+            if not self._renew_lease(cur, job_id, lease_token):
+                self.conn.rollback()
+                return False
+            cur.execute('DELETE FROM campuses WHERE id = %s', (campus_id,))
+            cur.execute("""
+            UPDATE campus_delete_jobs
+            SET status = 'completed', updated_at = CURRENT_TIMESTAMP, completed_at = CURRENT_TIMESTAMP
+            WHERE id = %s;
+            """, (job_id,))
+            self.conn.commit()
+            return True
+        except Exception as e:
+            self.conn.rollback()
+            raise Exception(f"Veritabanı kampüs silme işi tamamlama hatası: {str(e)}")
+        finally:
+            cur.close()
+
+    def release(self, job_id: int, lease_token: str) -> None:
+        """Temiz kapanışta işi bırakır; bir sonraki süreç lease süresini beklemeden devam eder."""
+        cur = self.conn.cursor()
+        try:
+            cur.execute("""
+            UPDATE campus_delete_jobs
+            SET status = 'pending', lease_token = NULL, heartbeat_at = NULL, updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s AND lease_token = %s;
+            """, (job_id, lease_token))
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            raise Exception(f"Veritabanı kampüs silme işi bırakma hatası: {str(e)}")
+        finally:
+            cur.close()
+
+    def fail(self, job_id: int, lease_token: str, error: str, max_attempts: int, retry_delay: float) -> None:
+        """Hata alan işi bekleme süresiyle yeniden kuyruğa koyar; max_attempts dolduysa 'failed' olarak işaretler.
+
+        Başarısız işte kampüs 'silinmekte' olarak gizli kalır (binaların bir kısmı silinmiş olabilir);
+        kurtarma yolu hata mesajında belirtilir.
+        """
+        cur = self.conn.cursor()
+        try:
+            cur.execute("""
+            UPDATE campus_delete_jobs
+            SET attempts = attempts + 1,
+                status = CASE WHEN attempts + 1 >= %(max_attempts)s THEN 'failed' ELSE 'pending' END,
+                error = CASE WHEN attempts + 1 >= %(max_attempts)s THEN %(error)s || ' (Silmeye devam etmek için DELETE /api/campuses/' || campus_id || '?background=true yeniden çağrılmalıdır.)' ELSE %(error)s END,
+                available_at = CURRENT_TIMESTAMP + make_interval(secs => %(retry_delay)s * (attempts + 1)),
+                lease_token = NULL,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = %(id)s AND lease_token = %(lease_token)s;
+            """, {
+                'id': job_id,
+                'lease_token': lease_token,
+                'error': error,
+                'max_attempts': max_attempts,
+                'retry_delay': retry_delay,
+            })
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            raise Exception(f"Veritabanı kampüs silme işi güncelleme hatası: {str(e)}")
+        finally:
+            cur.close()
+
+
+# ==================== ARKA PLAN İŞÇİSİ (Kampüs Silme) ====================
+
+class CampusDeleteWorker:
+    """Kampüs silme işlerini arka planda, sınırlı parçalar halinde yürütür.
+
+    Her parça kendi kısa işleminde silinir; böylece büyük kampüsler tek bir uzun
+    ON DELETE CASCADE işlemiyle diğer yazmaları bloklamaz.
+    """
+
+    def __init__(self, batch_size: int, poll_interval: float, lease_seconds: float, max_attempts: int, retry_delay: float):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="campus-delete-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+
+    def notify(self):
+        """Yeni iş kuyruğa eklendiğinde işçiyi bekleme süresini doldurmadan uyandırır."""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                processed = self._process_next_job()
+            except Exception as e:
+                print(f'❌ Kampüs silme işçisi hatası: {e}')
+                processed = False
+            if not processed:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def _process_next_job(self) -> bool:
+        connection = get_background_db_connection()
+        conn = next(connection)
+        try:
+            repository = CampusDeleteJobRepository(conn=conn)
+            lease_token = str(uuid.uuid4())
+            job = repository.claim_next(lease_token, self.lease_seconds)
+            if not job:
+                return False
+            try:
+                while True:
+                    # Temiz kapanışta iş bırakılır; lease süresi yalnızca çökme sonrası devralma için beklenir
+                    if self._stop.is_set():
+                        repository.release(job['id'], lease_token)
+                        break
+                    deleted = repository.delete_batch(job['id'], job['campus_id'], lease_token, self.batch_size)
+                    # None: iş başka bir işçiye geçti, bu işçi bırakır
+                    if deleted is None:
+                        break
+                    if deleted == 0:
+                        repository.complete(job['id'], job['campus_id'], lease_token)
+                        break
+            except Exception as e:
+                # Bağlantı kopması veya statement_timeout gibi geçici hatalar sınırlı sayıda yeniden denenir
+                repository.fail(job['id'], lease_token, str(e), self.max_attempts, self.retry_delay)
+            return True
+        finally:
+            # Bağlantıyı havuza iade et
+            connection.close()
+
+
+campus_delete_worker = CampusDeleteWorker(
+    batch_size=CAMPUS_DELETE_BATCH_SIZE,
+    poll_interval=CAMPUS_DELETE_POLL_INTERVAL,
+    lease_seconds=CAMPUS_DELETE_LEASE_SECONDS,
+    max_attempts=CAMPUS_DELETE_MAX_ATTEMPTS,
+    retry_delay=CAMPUS_DELETE_RETRY_DELAY
+)
+
+
+# ==================== PROFİLLEME (İsteğe Bağlı) ====================
+
+class RequestProfile:
+    """Örneklenen tek bir isteğin profil kaydı; servis çağrılarının cProfile istatistiklerini biriktirir."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, method: str, path: str):
+        self.id = next(self._ids)
+        self.method = method
+        self.path = path
+        self.created_at = datetime.utcnow()
+        self.duration_ms: Optional[float] = None
+        self.stats: Optional[pstats.Stats] = None
+        self._lock = threading.Lock()
+
+    def add(self, profiler: cProfile.Profile):
+        with self._lock:
+            if self.stats is None:
+                self.stats = pstats.Stats(profiler)
+            else:
+                self.stats.add(profiler)
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "created_at": self.created_at,
+            "duration_ms": self.duration_ms,
+        }
+
+
+# Son profiller için halka tampon (en eskisi otomatik düşer)
+profile_buffer: Deque[RequestProfile] = deque(maxlen=PROFILE_BUFFER_SIZE)
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar('current_profile', default=None)
+
+# cProfile süreç genelinde tek profilleyiciye izin verir (3.12+ ikinciyi ValueError ile reddeder,
+# üstelik tüm iş parçacıklarını kaydeder); aynı anda yalnızca bir servis çağrısı profillenir.
+_profiler_lock = threading.Lock()
+
+
+def profiled(func):
+    """Örneklenen isteklerde servis metodunu cProfile altında çalıştırır; diğer isteklerde yalnızca bir ContextVar okur.
+
+    Profilleme hiçbir zaman isteği başarısız kılmaz: başka bir çağrı zaten profilleniyorsa
+    (iç içe servis çağrıları dahil) ya da profilleyici başlatılamazsa metot profilsiz çalışır.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        record = _current_profile.get()
+        if record is None or not _profiler_lock.acquire(blocking=False):
+            return func(*args, **kwargs)
+        try:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except Exception:
+                return func(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.disable()
+                try:
+                    record.add(profiler)
+                except Exception:
+                    pass
+        finally:
+            _profiler_lock.release()
+    return wrapper
+
+
+def _frame_label(func) -> str:
+    filename, lineno, name = func
+    if filename == '~':
+        return name
+    return f"{name} ({os.path.basename(filename)}:{lineno})".replace(';', ':')
+
+
+def collapsed_stacks(stats: pstats.Stats) -> str:
+    """cProfile çağıran/çağrılan grafiğinden flamegraph.pl uyumlu 'collapsed stack' satırları üretir.
+
+    cProfile tam çağrı yığınlarını tutmaz; bir fonksiyonun süresi, çağıranlarına
+    kenar sürelerinin oranında dağıtılır. Sonuç yaklaşık bir görünümdür (birim: µs).
+    """
+    callees = defaultdict(dict)
+    roots = []
+    for func, (cc, nc, tt, ct, callers) in stats.stats.items():
+        if not callers:
+            roots.append(func)
+        for caller, edge in callers.items():
+            # edge[3]: bu kenar üzerinden geçen kümülatif süre
+            callees[caller][func] = edge[3]
+
+    lines = defaultdict(float)
+
+    def walk(func, stack, path, share):
+        tt, ct = stats.stats[func][2], stats.stats[func][3]
+        stack = stack + [_frame_label(func)]
+        lines[';'.join(stack)] += tt * share
+        for callee, edge_ct in callees.get(func, {}).items():
+            callee_ct = stats.stats[callee][3]
+            # Özyinelemeyi ve 1 µs altındaki dalları atla
+            if callee in path or callee_ct <= 0 or edge_ct * share < 1e-6:
+                continue
+            walk(callee, stack, path | {callee}, share * edge_ct / callee_ct)
+
+    for root in roots:
+        walk(root, [], {root}, 1.0)
+
+    return '\n'.join(
+        f"{stack} {round(seconds * 1_000_000)}"
+        for stack, seconds in lines.items()
+        if round(seconds * 1_000_000) > 0
+    ) + '\n'
+
 
 # ==================== SERVICE KATMANI (İş Mantığı) ====================
 
 class CampusService:
-    def __init__(self, repository: CampusRepository):
+    def __init__(self, repository: CampusRepository, job_repository: CampusDeleteJobRepository):
         self.repository = repository
+        self.job_repository = job_repository
     
+    @profiled
     def create_campus(self, campus_dto: CampusCreateDTO) -> CampusResponseDTO:
         try:
             campus_data = campus_dto.model_dump()
@@ -116,6 +664,7 @@ class CampusService:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Kampüs oluşturulurken bir sunucu hatası oluştu.")
     
+    @profiled
     def get_campuses(self, city: Optional[str]) -> List[CampusResponseDTO]:
         try:
             campuses = self.repository.find_all(city)
@@ -123,6 +672,7 @@ class CampusService:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Kampüsler listelenirken bir sunucu hatası oluştu.")
     
+    @profiled
     def get_campus_by_id(self, campus_id: int) -> CampusResponseDTO:
         try:
             campus = self.repository.find_by_id(campus_id)
@@ -134,6 +684,7 @@ class CampusService:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Kampüs getirilirken bir sunucu hatası oluştu.")
 
+    @profiled
     def update_campus(self, campus_id: int, campus_dto: CampusUpdateDTO) -> CampusResponseDTO:
         existing = self.repository.find_by_id(campus_id)
         if not existing:
@@ -149,6 +700,7 @@ class CampusService:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Kampüs güncellenirken bir sunucu hatası oluştu.")
 
+    @profiled
     def delete_campus(self, campus_id: int) -> CampusResponseDTO:
         try:
             campus = self.repository.delete(campus_id)
@@ -160,12 +712,38 @@ class CampusService:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Kampüs silinirken bir sunucu hatası oluştu.")
 
+    @profiled
+    def delete_campus_async(self, campus_id: int) -> CampusDeleteJobResponseDTO:
+        try:
+            # Aynı kampüs için devam eden bir iş varsa enqueue onu döndürür
+            job = self.job_repository.enqueue(campus_id)
+            if not job:
+                raise HTTPException(status_code=404, detail=f"ID {campus_id} ile kampüs bulunamadı")
+            return CampusDeleteJobResponseDTO(**job)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Kampüs silme işi oluşturulurken bir sunucu hatası oluştu.")
+
+    @profiled
+    def get_delete_job(self, job_id: int) -> CampusDeleteJobResponseDTO:
+        try:
+            job = self.job_repository.find_by_id(job_id)
+            if not job:
+                raise HTTPException(status_code=404, detail=f"ID {job_id} ile kampüs silme işi bulunamadı")
+            return CampusDeleteJobResponseDTO(**job)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Kampüs silme işi getirilirken bir sunucu hatası oluştu.")
+
 
 class BuildingService:
     def __init__(self, repository: BuildingRepository, campus_repository: CampusRepository):
         self.repository = repository
         self.campus_repository = campus_repository
     
+    @profiled
     def create_building(self, building_dto: BuildingCreateDTO) -> BuildingResponseDTO:
         # Kampüs var mı kontrol et
         if not self.campus_repository.find_by_id(building_dto.campus_id):
@@ -178,6 +756,7 @@ class BuildingService:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Bina oluşturulurken bir sunucu hatası oluştu.")
     
+    @profiled
     def get_buildings(self, campus_id: Optional[int]) -> List[BuildingResponseDTO]:
         # Eğer campus_id verilmişse, kampüsün varlığını kontrol et
         if campus_id is not None and not self.campus_repository.find_by_id(campus_id):
@@ -189,6 +768,7 @@ class BuildingService:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Binalar listelenirken bir sunucu hatası oluştu.")
     
+    @profiled
     def get_building_by_id(self, building_id: int) -> BuildingResponseDTO:
         try:
             building = self.repository.find_by_id(building_id)
@@ -200,6 +780,7 @@ class BuildingService:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Bina getirilirken bir sunucu hatası oluştu.")
 
+    @profiled
     def update_building(self, building_id: int, building_dto: BuildingUpdateDTO) -> BuildingResponseDTO:
         existing = self.repository.find_by_id(building_id)
         if not existing:
@@ -220,6 +801,7 @@ class BuildingService:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Bina güncellenirken bir sunucu hatası oluştu.")
     
+    @profiled
     def delete_building(self, building_id: int) -> BuildingResponseDTO:
         try:
             building = self.repository.delete(building_id)
@@ -231,6 +813,67 @@ class BuildingService:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Bina silinirken bir sunucu hatası oluştu.")
 
+    def _bulk_filter_data(self, filter_dto: Optional[BuildingBulkFilterDTO]) -> dict:
+        filter_data = filter_dto.model_dump(exclude_none=True) if filter_dto else {}
+        # Filtresiz toplu işlem tüm binaları etkiler; buna izin verme
+        if not filter_data:
+            raise HTTPException(status_code=400, detail="En az bir filtre (campus_id, type veya ids) gönderilmelidir.")
+        if 'campus_id' in filter_data and not self.campus_repository.find_by_id(filter_data['campus_id']):
+            raise HTTPException(status_code=404, detail=f"Kampüs ID {filter_data['campus_id']} bulunamadı.")
+        return filter_data
+
+    @profiled
+    def bulk_update_buildings(self, bulk_dto: BuildingBulkUpdateDTO, return_ids: bool = False) -> BuildingBulkResultDTO:
+        if (bulk_dto.items is None) == (bulk_dto.values is None):
+            raise HTTPException(status_code=400, detail="Ya filter ile birlikte values ya da yalnızca items gönderilmelidir.")
+
+        if bulk_dto.items is not None:
+            if bulk_dto.filter is not None:
+                raise HTTPException(status_code=400, detail="items ile birlikte filter gönderilemez.")
+            rows = [item.model_dump(exclude_unset=True) for item in bulk_dto.items]
+            fields = sorted(set(rows[0]) - {'id'})
+            for row in rows:
+                # Campus ID'sinin güncellenmesini engelle
+                if 'campus_id' in row:
+                    raise HTTPException(status_code=400, detail="Binanın ait olduğu kampüs (campus_id) güncellenemez.")
+                # VALUES listesindeki her satır aynı sütunları taşımalı
+                if sorted(set(row) - {'id'}) != fields:
+                    raise HTTPException(status_code=400, detail="items içindeki tüm binalar aynı alanları güncellemelidir.")
+            if not fields:
+                raise HTTPException(status_code=400, detail="Güncellenecek veri gönderilmedi")
+            if len({row['id'] for row in rows}) != len(rows):
+                raise HTTPException(status_code=400, detail="items içinde aynı bina ID'si birden fazla kez gönderilemez.")
+            try:
+                result = self.repository.bulk_update_by_ids(rows, fields, return_ids)
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Binalar toplu güncellenirken bir sunucu hatası oluştu.")
+            return BuildingBulkResultDTO(**result)
+
+        update_data = bulk_dto.values.model_dump(exclude_unset=True)
+
+        # Campus ID'sinin güncellenmesini engelle
+        if 'campus_id' in update_data:
+            raise HTTPException(status_code=400, detail="Binanın ait olduğu kampüs (campus_id) güncellenemez.")
+
+        if not update_data:
+            raise HTTPException(status_code=400, detail="Güncellenecek veri gönderilmedi")
+
+        filter_data = self._bulk_filter_data(bulk_dto.filter)
+        try:
+            result = self.repository.bulk_update_by_filter(filter_data, update_data, return_ids)
+            return BuildingBulkResultDTO(**result)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Binalar toplu güncellenirken bir sunucu hatası oluştu.")
+
+    @profiled
+    def bulk_delete_buildings(self, filter_dto: BuildingBulkFilterDTO, return_ids: bool = False) -> BuildingBulkResultDTO:
+        filter_data = self._bulk_filter_data(filter_dto)
+        try:
+            result = self.repository.bulk_delete(filter_data, return_ids)
+            return BuildingBulkResultDTO(**result)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Binalar toplu silinirken bir sunucu hatası oluştu.")
+
 # ==================== FASTAPI APP VE BAĞIMLILIKLAR ====================
 
 @asynccontextmanager
@@ -238,8 +881,11 @@ async def lifespan(app: FastAPI):
     # Startup: Bağlantı havuzunu başlat ve tabloları oluştur
     initialize_db_pool()
     create_tables()
+    # Yarım kalmış kampüs silme işleri varsa işçi bunları kaldığı yerden sürdürür
+    campus_delete_worker.start()
     yield
-    # Shutdown: Bağlantı havuzunu kapat
+    # Shutdown: Arka plan işçisini durdur ve bağlantı havuzunu kapat
+    campus_delete_worker.stop()
     close_db_pool()
 
 app = FastAPI(
@@ -260,14 +906,60 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --- Profilleme Middleware (yalnızca PROFILE_ADMIN_TOKEN ayarlıysa eklenir; örnekleme oranı buna ek çalışır) ---
+def _has_admin_token(value: Optional[str]) -> bool:
+    return bool(PROFILE_ADMIN_TOKEN) and value is not None and hmac.compare_digest(value, PROFILE_ADMIN_TOKEN)
+
+class ProfilingMiddleware:
+    """Örneklenen isteklerde yalnızca _current_profile'ı ayarlar.
+
+    Saf ASGI middleware'dir: receive/send olduğu gibi iletilir, böylece
+    request.is_disconnected() (run_cancellable) çalışmaya devam eder.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _sampled(self, scope) -> bool:
+        for name, value in scope['headers']:
+            if name == b'x-admin-token':
+                return _has_admin_token(value.decode('latin-1')) or random.random() < PROFILE_SAMPLE_RATE
+        return random.random() < PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'].startswith('/api/admin/') or not self._sampled(scope):
+            await self.app(scope, receive, send)
+            return
+
+        record = RequestProfile(scope['method'], scope['path'])
+        token = _current_profile.set(record)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_profile.reset(token)
+            record.duration_ms = round((time.perf_counter() - start) * 1000, 2)
+            # Servis çağrısı olmayan istekler (ör. 404) tampona yazılmaz
+            if record.stats is not None:
+                profile_buffer.append(record)
+
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
 
 # === Bağımlılık Enjeksiyonu (Dependency Injection) Fonksiyonları ===
 
 def get_campus_repository(conn=Depends(get_db_connection)) -> CampusRepository:
     return CampusRepository(conn=conn)
 
-def get_campus_service(repository: CampusRepository = Depends(get_campus_repository)) -> CampusService:
-    return CampusService(repository=repository)
+def get_campus_delete_job_repository(conn=Depends(get_db_connection)) -> CampusDeleteJobRepository:
+    return CampusDeleteJobRepository(conn=conn)
+
+def get_campus_service(
+    repository: CampusRepository = Depends(get_campus_repository),
+    job_repository: CampusDeleteJobRepository = Depends(get_campus_delete_job_repository)
+) -> CampusService:
+    return CampusService(repository=repository, job_repository=job_repository)
 
 def get_building_repository(conn=Depends(get_db_connection)) -> BuildingRepository:
     return BuildingRepository(conn=conn)
@@ -279,6 +971,47 @@ def get_building_service(
     return BuildingService(repository=repository, campus_repository=campus_repository)
 
 
+# --- Okuma rotaları: salt-okunur, kısa zaman aşımlı bağlantı (get_read_db_connection) ---
+
+def get_read_campus_repository(conn=Depends(get_read_db_connection)) -> CampusRepository:
+    return CampusRepository(conn=conn)
+
+def get_read_campus_delete_job_repository(conn=Depends(get_read_db_connection)) -> CampusDeleteJobRepository:
+    return CampusDeleteJobRepository(conn=conn)
+
+def get_read_campus_service(
+    repository: CampusRepository = Depends(get_read_campus_repository),
+    job_repository: CampusDeleteJobRepository = Depends(get_read_campus_delete_job_repository)
+) -> CampusService:
+    return CampusService(repository=repository, job_repository=job_repository)
+
+def get_read_building_repository(conn=Depends(get_read_db_connection)) -> BuildingRepository:
+    return BuildingRepository(conn=conn)
+
+def get_read_building_service(
+    repository: BuildingRepository = Depends(get_read_building_repository),
+    campus_repository: CampusRepository = Depends(get_read_campus_repository)
+) -> BuildingService:
+    return BuildingService(repository=repository, campus_repository=campus_repository)
+
+
+async def run_cancellable(request: Request, conn, func, *args):
+    """Uzun okumayı iş parçacığında çalıştırır; istemci bağlantıyı keserse sunucudaki sorguyu iptal eder."""
+    # ContextVar'lar (ör. profil kaydı) iş parçacığına da taşınsın
+    task = asyncio.ensure_future(run_in_threadpool(copy_context().run, func, *args))
+    while not task.done():
+        await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+        if not task.done() and await request.is_disconnected():
+            # Sorgu havuzdaki bağlantıyı tutmaya devam etmesin
+            conn.cancel()
+            try:
+                await task
+            except Exception:
+                pass
+            raise HTTPException(status_code=499, detail="İstemci bağlantıyı kapattı, sorgu iptal edildi.")
+    return task.result()
+
+
 # ==================== ENDPOINTS (Kampüs Yönetimi) ====================
 
 @app.get("/", tags=["Root"])
@@ -299,16 +1032,18 @@ async def create_campus(
 
 @app.get("/api/campuses", response_model=List[CampusResponseDTO], tags=["Campuses"])
 async def get_campuses(
+    request: Request,
     city: Optional[str] = Query(None, description="Şehir adına göre filtrele"), 
-    service: CampusService = Depends(get_campus_service)
+    service: CampusService = Depends(get_read_campus_service),
+    conn=Depends(get_read_db_connection)
 ):
     """Tüm kampüsleri listele veya `city` sorgu parametresi ile filtrele."""
-    return service.get_campuses(city)
+    return await run_cancellable(request, conn, service.get_campuses, city)
 
 @app.get("/api/campuses/{campus_id}", response_model=CampusResponseDTO, tags=["Campuses"])
 async def get_campus(
     campus_id: int, 
-    service: CampusService = Depends(get_campus_service)
+    service: CampusService = Depends(get_read_campus_service)
 ):
     """ID'ye göre kampüs getir"""
     return service.get_campus_by_id(campus_id)
@@ -322,14 +1057,33 @@ async def update_campus(
     """Kampüs güncelle"""
     return service.update_campus(campus_id, campus)
 
-@app.delete("/api/campuses/{campus_id}", response_model=CampusResponseDTO, tags=["Campuses"])
+@app.delete("/api/campuses/{campus_id}", response_model=Union[CampusResponseDTO, CampusDeleteJobResponseDTO], tags=["Campuses"])
 async def delete_campus(
     campus_id: int, 
+    response: Response,
+    background: bool = Query(False, description="Binaları arka planda parça parça sil (büyük kampüsler için)"),
     service: CampusService = Depends(get_campus_service)
 ):
-    """Kampüs sil (Bağlı binalar da silinir - ON DELETE CASCADE)"""
+    """Kampüs sil (Bağlı binalar da silinir - ON DELETE CASCADE).
+
+    `background=true` ile kampüs hemen gizlenir, binalar arka planda silinir ve
+    202 ile silme işi döner; durum `/api/campus-delete-jobs/{job_id}` ile izlenir.
+    """
+    if background:
+        job = service.delete_campus_async(campus_id)
+        campus_delete_worker.notify()
+        response.status_code = status.HTTP_202_ACCEPTED
+        return job
     return service.delete_campus(campus_id)
 
+@app.get("/api/campus-delete-jobs/{job_id}", response_model=CampusDeleteJobResponseDTO, tags=["Campuses"])
+async def get_campus_delete_job(
+    job_id: int,
+    service: CampusService = Depends(get_read_campus_service)
+):
+    """Arka plan kampüs silme işinin durumunu getir"""
+    return service.get_delete_job(job_id)
+
 # ==================== ENDPOINTS (Bina Yönetimi) ====================
 
 @app.post("/api/buildings", response_model=BuildingResponseDTO, status_code=status.HTTP_201_CREATED, tags=["Buildings"])
@@ -342,16 +1096,48 @@ async def create_building(
 
 @app.get("/api/buildings", response_model=List[BuildingResponseDTO], tags=["Buildings"])
 async def get_buildings(
+    request: Request,
     campus_id: Optional[int] = Query(None, description="Kampüs ID'sine göre filtrele"), 
-    service: BuildingService = Depends(get_building_service)
+    service: BuildingService = Depends(get_read_building_service),
+    conn=Depends(get_read_db_connection)
 ):
     """Tüm binaları listele veya Kampüs ID'sine göre filtrele"""
-    return service.get_buildings(campus_id)
+    return await run_cancellable(request, conn, service.get_buildings, campus_id)
+
+# Toplu işlemler /api/buildings/{building_id} rotalarından önce tanımlanmalı ("bulk" bir ID değildir)
+@app.patch("/api/buildings/bulk", response_model=BuildingBulkResultDTO, tags=["Buildings"])
+async def bulk_update_buildings(
+    bulk: BuildingBulkUpdateDTO,
+    return_ids: bool = Query(False, description="Etkilenen bina ID'lerini de döndür (en fazla 1000)"),
+    service: BuildingService = Depends(get_building_service)
+):
+    """Binaları tek sorguda toplu güncelle.
+
+    `filter` (campus_id, type, ids) + `values` ile eşleşen tüm binalara aynı değerler,
+    ya da `items` ile bina başına farklı değerler uygulanır. campus_id güncellenemez.
+    """
+    return service.bulk_update_buildings(bulk, return_ids)
+
+@app.delete("/api/buildings/bulk", response_model=BuildingBulkResultDTO, tags=["Buildings"])
+async def bulk_delete_buildings(
+    campus_id: Optional[int] = Query(None, description="Kampüs ID'sine göre filtrele"),
+    building_type: Optional[str] = Query(None, alias="type", description="Bina tipine göre filtrele"),
+    ids: Optional[List[int]] = Query(None, description="Bina ID listesi (?ids=1&ids=2)"),
+    return_ids: bool = Query(False, description="Etkilenen bina ID'lerini de döndür (en fazla 1000)"),
+    service: BuildingService = Depends(get_building_service)
+):
+    """Filtreye (campus_id, type, ids) uyan binaları tek sorguda sil"""
+    # Sorgu parametreleri toplu güncellemedeki filtre kurallarıyla doğrulanır
+    try:
+        bulk_filter = BuildingBulkFilterDTO(campus_id=campus_id, type=building_type, ids=ids)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    return service.bulk_delete_buildings(bulk_filter, return_ids)
 
 @app.get("/api/buildings/{building_id}", response_model=BuildingResponseDTO, tags=["Buildings"])
 async def get_building(
     building_id: int, 
-    service: BuildingService = Depends(get_building_service)
+    service: BuildingService = Depends(get_read_building_service)
 ):
     """ID'ye göre bina getir"""
     return service.get_building_by_id(building_id)
@@ -374,6 +1160,44 @@ async def delete_building(
     return service.delete_building(building_id)
 
 
+# ==================== ENDPOINTS (Profilleme - Yönetici) ====================
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    if not _has_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Bu işlem için geçerli bir X-Admin-Token gereklidir.")
+
+@app.get("/api/admin/profiles", tags=["Admin"], dependencies=[Depends(require_admin_token)])
+async def list_profiles():
+    """Halka tampondaki son istek profillerini listele (en yenisi önce)"""
+    return [record.summary() for record in reversed(profile_buffer)]
+
+@app.get("/api/admin/profiles/{profile_id}", tags=["Admin"], dependencies=[Depends(require_admin_token)])
+async def get_profile(
+    profile_id: int,
+    format: str = Query("text", pattern="^(text|pstats|collapsed)$", description="text, pstats veya collapsed (flamegraph)"),
+    limit: int = Query(50, ge=1, le=500, description="text formatında gösterilecek satır sayısı")
+):
+    """Profili indir: `pstats` (pstats.Stats ile açılır), `collapsed` (flamegraph.pl) veya `text` özet"""
+    record = next((r for r in profile_buffer if r.id == profile_id), None)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"ID {profile_id} ile profil bulunamadı")
+
+    if format == "pstats":
+        return Response(
+            content=marshal.dumps(record.stats.stats),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.pstats"'}
+        )
+    if format == "collapsed":
+        return PlainTextResponse(collapsed_stacks(record.stats))
+
+    stream = io.StringIO()
+    stats = pstats.Stats(stream=stream)
+    stats.add(record.stats)
+    stats.sort_stats("cumulative").print_stats(limit)
+    return PlainTextResponse(stream.getvalue())
+
+
 # ==================== RUN ====================
 if __name__ == "__main__":
     import uvicorn